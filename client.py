@@ -1,35 +1,113 @@
 import socket
 import threading
+import logging
 import pickle
-import math
+import struct
+from collections import deque
 import tkinter as tk
+import tkinter.font as tkfont
 from tkinter import ttk, messagebox, simpledialog, scrolledtext
+from PIL import Image, ImageDraw, ImageTk
+
+from network import MAX_FRAME
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 PLAYER_X = 1
 PLAYER_O = 2
+LABEL_EVERY = 5
+GLYPH_SUPERSAMPLE = 4
+BUCKET_SHIFT = 5
+CONNECT_TIMEOUT = 3
+RECV_BUFFER_SIZE = 65536
+HEADER = struct.Struct('!I')
+GRID_TILE_SIZE = 256
+# The server's reply to a move on a taken or out-of-range cell; the turn is still ours.
+ERROR_INVALID_MOVE = "Mutare invalidă!"
+
+GRID_COLOR = "#e0e0e0"
+LABEL_COLOR = "gray"
+X_COLOR = "#4285F4"
+O_FILL = "#EA4335"
+O_OUTLINE = "#D33426"
+
+
+def pack_key(x, y):
+    # Board cells as one int (two's-complement x in the low 32 bits, y above it), which
+    # hashes and compares faster than an (x, y) tuple.
+    return (x & 0xFFFFFFFF) | ((y & 0xFFFFFFFF) << 32)
+
+
+def grid_positions(origin, step, first, last, every=1):
+    first += -first % every
+    return [(i, origin + i * step) for i in range(first, last + 1, every)]
 
 
 class GameClient:
     def __init__(self):
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        # Moves are tiny packets; don't let Nagle hold them back waiting for an ACK.
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
         self.name = ""
         self.room_id = ""
         self.player_symbol = None
-        self.board = {}
+        self.occupied = set()
+        self.pieces = {PLAYER_X: {}, PLAYER_O: {}}
         self.is_ready = False
         self.is_my_turn = False
         self.game_active = False
+        self._messages = deque()
+        self._outgoing = deque()
+        self._pending_moves = deque()
+        self._outgoing_ready = threading.Event()
+        self._connection_lost = False
+        self._recv_buffer = bytearray(RECV_BUFFER_SIZE)
+        self._recv_view = memoryview(self._recv_buffer)
+        self._process_pending = False
+        self.message_handlers = {
+            "room_created": self.on_room_created,
+            "room_joined": self.on_room_joined,
+            "room_info": self.on_room_info,
+            "chat": self.on_chat,
+            "ready_status": self.on_ready_status,
+            "init": self.on_init,
+            "update": self.on_update,
+            "win": self.on_win,
+            "error": self.on_error,
+        }
 
         self.cell_size = 25
         self.offset_x = 0
         self.offset_y = 0
         self.zoom_level = 1.0
+        self._step = self.cell_size
         self.is_dragging = False
         self.last_mouse_x = 0
         self.last_mouse_y = 0
         self.drag_threshold = 5
 
+        self._grid_img = None
+        self._grid_tile = None
+        self._grid_step = None
+        self._grid_items = []
+        self._grid_origin = (0, 0)
+        self.piece_items = {}
+        self._free_pieces = []
+        self._col_labels = []
+        self._row_labels = []
+        self._glyphs = {}
+        self._glyph_size = None
+        self._last_view = None
+        self._visible = None
+        self._visible_key = None
+        self._redraw_scheduled = False
+        self._canvas_size = (0, 0)
+
         self.root = tk.Tk()
+        self.label_font = tkfont.Font(root=self.root, family="Arial", size=8)
         self.root.title("Amoba Game")
         self.root.geometry("800x850")
         self.root.resizable(True, True)
@@ -68,6 +146,10 @@ class GameClient:
 
         self.canvas = tk.Canvas(self.game_frame, bg="white", highlightthickness=0)
         self.canvas.pack(fill='both', expand=True)
+        # The per-item hot paths call the Tcl canvas command directly, skipping the
+        # Tkinter wrappers' option-dict flattening on every call.
+        self._tk_call = self.canvas.tk.call
+        self._canvas_path = str(self.canvas)
 
         self.mouse_press_x = 0
         self.mouse_press_y = 0
@@ -94,202 +176,523 @@ class GameClient:
         if not self.name:
             self.name = "Player_" + str(id(self) % 1000)
 
+        # The TCP connect runs on a worker thread so an unreachable server times out
+        # without freezing the window; the handshake resumes on the Tk thread.
+        threading.Thread(target=self._connect_worker, daemon=True).start()
+
+    def _connect_worker(self):
         try:
+            self.sock.settimeout(CONNECT_TIMEOUT)
             self.sock.connect(("localhost", 8765))
-            self.sock.sendall(self.name.encode("utf-8"))
-            self.update_info_bar(f"Conectat ca {self.name}")
-        except ConnectionError:
-            messagebox.showerror(f"Eroare", "Nu mă pot conecta la server {ConnectionError}", parent=self.root)
-            self.root.destroy()
+            self.sock.settimeout(None)
+        except OSError as e:
+            self.root.after(0, self._on_connect_failed, e)
             return
+        self.root.after(0, self._on_connected)
+
+    def _on_connect_failed(self, error):
+        messagebox.showerror("Eroare", f"Nu mă pot conecta la server {error}", parent=self.root)
+        self.root.destroy()
+
+    def _on_connected(self):
+        # The handshake goes out as framed messages through the writer thread, in order
+        # with everything sent after it.
+        threading.Thread(target=self.send_loop, daemon=True).start()
+        self.send_message(self.name)
+        self.update_info_bar(f"Conectat ca {self.name}")
 
         choice = messagebox.askquestion("Creează sau Alătură-te", "Vrei să creezi o cameră nouă?", parent=self.root)
         if choice == "yes":
-            self.sock.sendall(b"CREATE")
+            self.send_message("CREATE")
         else:
             room_id = simpledialog.askstring("Room ID", "Introdu ID-ul camerei:", parent=self.root)
             if room_id:
                 self.room_id = room_id
-                self.sock.sendall(f"JOIN {room_id}".encode("utf-8"))
+                self.send_message(f"JOIN {room_id}")
             else:
-                self.sock.sendall(b"CREATE")
+                self.send_message("CREATE")
 
         threading.Thread(target=self.receive_loop, daemon=True).start()
 
     def receive_loop(self):
         while True:
             try:
-                data = self.sock.recv(4096)
-                if not data:
+                msg = self.recv_message()
+                if msg is None:
                     break
-                msg = pickle.loads(data)
-                self.root.after(0, self.handle_message, msg)
+                self._messages.append(msg)
+                if not self._process_pending:
+                    self._process_pending = True
+                    self.root.after_idle(self._drain_messages)
             except Exception as e:
-                print(f"[CLIENT {self.name}] Error in receive loop: {e}")
+                logger.error("[CLIENT %s] Error in receive loop: %s", self.name, e)
                 self.root.after(0, self.show_error, "Conexiunea cu serverul s-a pierdut")
                 break
+        self._connection_lost = True
         self.sock.close()
-        self.root.after(0, self.update_info_bar, "Deconectat de la server")
-
-    def handle_message(self, msg):
-        print(f"[CLIENT {self.name}] Received msg: {msg['type']}")
-
-        if msg["type"] == "room_created":
-            self.room_id = msg["room_id"]
-            self.player_symbol = msg["player"]
-            self.show_info(f"Camera creată: {self.room_id}")
-            self.update_info_bar(
-                f"{self.name} | Camera: {self.room_id} | Jucător: {'X' if self.player_symbol == PLAYER_X else 'O'} | Așteaptă adversarul")
-
-        elif msg["type"] == "room_joined":
-            self.room_id = msg["room_id"]
-            self.player_symbol = msg["player"]
-            self.show_info(f"Te-ai alăturat camerei: {self.room_id}")
-            self.update_info_bar(
-                f"{self.name} | Camera: {self.room_id} | Jucător: {'X' if self.player_symbol == PLAYER_X else 'O'} | Așteaptă start joc")
-
-        elif msg["type"] == "room_info":
-            self.players_listbox.delete(0, tk.END)
-            for p_info in msg["players_info"]:
-                status = "✓" if p_info["is_ready"] else "○"
-                symbol_display = 'X' if p_info['symbol'] == PLAYER_X else ('O' if p_info['symbol'] == PLAYER_O else '?')
-                self.players_listbox.insert(tk.END, f"{status} {p_info['name']} ({symbol_display})")
-
-        elif msg["type"] == "chat":
-            self.append_chat(f"{msg['player']}: {msg['message']}")
-
-        elif msg["type"] == "ready_status":
-            self.append_chat(f"{msg['player']} este gata!")
-
-        elif msg["type"] == "init":
-            print(f"[CLIENT {self.name}] INIT message received with data: {msg}")
-            self.board.clear()
-            self.game_active = True
-            self.is_my_turn = msg["is_my_turn"]
-            self.player_symbol = msg["player_symbol"]
-
-            if "board" in msg and msg["board"]:
-                self.board.update(msg["board"])
-
-            self.draw_board()
-            self.append_chat("Jocul începe!")
-
-            turn_text = "Rândul tău!" if self.is_my_turn else f"Rândul lui {msg.get('current_turn_player_name', 'adversarul')}"
-            self.update_info_bar(
-                f"{self.name} | Camera: {self.room_id} | Jucător: {'X' if self.player_symbol == PLAYER_X else 'O'} | {turn_text}")
-            self.ready_btn.config(state='disabled')
-
-            print(
-                f"[CLIENT {self.name}] INIT processed. Game active: {self.game_active}, My turn: {self.is_my_turn}, My symbol: {self.player_symbol}")
-
-        elif msg["type"] == "update":
-            print(
-                f"[CLIENT {self.name}] UPDATE received: x={msg['x']}, y={msg['y']}, player_symbol={msg['player_symbol']}, is_my_turn={msg['is_my_turn']}")
-
-            self.board[(msg["x"], msg["y"])] = msg["player_symbol"]
-            self.is_my_turn = msg["is_my_turn"]
-
-            print(f"[CLIENT {self.name}] Board updated. My turn now: {self.is_my_turn}")
-            print(
-                f"[CLIENT {self.name}] Current board state: {dict(list(self.board.items())[:5])}...")
+        self.root.after(0, self._on_disconnected)
+
+    def recv_exactly(self, size):
+        # Reads land in one reusable buffer; the returned view is only valid until the
+        # next read, which is enough since every message is unpickled straight away.
+        if size > len(self._recv_buffer):
+            self._recv_buffer = bytearray(size)
+            self._recv_view = memoryview(self._recv_buffer)
+        view = self._recv_view
+        received = 0
+        while received < size:
+            n = self.sock.recv_into(view[received:size])
+            if not n:
+                return None
+            received += n
+        return view[:size]
+
+    def recv_message(self):
+        # Every game message is a pickle behind a 4-byte big-endian length, so one
+        # recv never has to line up with one message.
+        header = self.recv_exactly(HEADER.size)
+        if header is None:
+            return None
+        length = HEADER.unpack_from(header)[0]
+        if length > MAX_FRAME:
+            raise ValueError(f"Frame too large: {length} bytes")
+        data = self.recv_exactly(length)
+        if data is None:
+            return None
+        return pickle.loads(data)
+
+    def send_message(self, msg):
+        # Returns False once the connection is gone, so callers never act on a frame
+        # that will not be sent.
+        if self._connection_lost:
+            return False
+        data = pickle.dumps(msg, protocol=pickle.HIGHEST_PROTOCOL)
+        self._outgoing.append(HEADER.pack(len(data)) + data)
+        self._outgoing_ready.set()
+        return True
+
+    def send_loop(self):
+        # Frames queued from the Tk thread are written here, so a slow network never
+        # blocks the window; whatever piled up since the last write goes out in one sendall.
+        while True:
+            self._outgoing_ready.wait()
+            self._outgoing_ready.clear()
+            frames = []
+            while self._outgoing:
+                frames.append(self._outgoing.popleft())
+            if not frames:
+                continue
+            try:
+                self.sock.sendall(b"".join(frames))
+            except OSError as e:
+                logger.error("[CLIENT %s] Error in send loop: %s", self.name, e)
+                self._connection_lost = True
+                self.root.after(0, self._on_send_failed)
+                break
 
-            self.draw_board()
-            turn_text = "Rândul tău!" if self.is_my_turn else f"Rândul lui {msg.get('turn', 'adversarul')}"
-            self.update_info_bar(
-                f"{self.name} | Camera: {self.room_id} | Jucător: {'X' if self.player_symbol == PLAYER_X else 'O'} | {turn_text}")
+    def _on_send_failed(self):
+        self._drop_pending_moves()
+        self.show_error("Conexiunea cu serverul s-a pierdut")
+
+    def _on_disconnected(self):
+        # Whatever arrived before the close is handled first, so moves the server
+        # already confirmed stay on the board.
+        self._drain_messages()
+        self._drop_pending_moves()
+        self.update_info_bar("Deconectat de la server")
+
+    def _drop_pending_moves(self):
+        # Moves still queued or unconfirmed will never be answered once the connection
+        # is gone, so their predicted pieces are taken back and the board stops taking clicks.
+        self._outgoing.clear()
+        while self._pending_moves:
+            x, y, player_symbol = self._pending_moves.popleft()
+            self.remove_piece(x, y, player_symbol)
+        self.is_my_turn = False
+        self.game_active = False
 
-        elif msg["type"] == "win":
-            print(f"[CLIENT {self.name}] WIN received: winner={msg['winner']}")
+    def _drain_messages(self):
+        # One scheduled callback drains everything received since it was queued,
+        # instead of stacking one Tk callback per incoming message.
+        self._process_pending = False
+        while self._messages:
+            self.handle_message(self._messages.popleft())
 
-            if msg["x"] != -1 and msg["y"] != -1:
-                self.board[(msg["x"], msg["y"])] = msg["player_symbol"]
+    def handle_message(self, msg):
+        logger.debug("[CLIENT %s] Received msg: %s", self.name, msg["type"])
+        handler = self.message_handlers.get(msg["type"])
+        if handler:
+            handler(msg)
+
+    def on_room_created(self, msg):
+        self.room_id = msg["room_id"]
+        self.player_symbol = msg["player"]
+        self.show_info(f"Camera creată: {self.room_id}")
+        self.update_info_bar(
+            f"{self.name} | Camera: {self.room_id} | Jucător: {'X' if self.player_symbol == PLAYER_X else 'O'} | Așteaptă adversarul")
+
+    def on_room_joined(self, msg):
+        self.room_id = msg["room_id"]
+        self.player_symbol = msg["player"]
+        self.show_info(f"Te-ai alăturat camerei: {self.room_id}")
+        self.update_info_bar(
+            f"{self.name} | Camera: {self.room_id} | Jucător: {'X' if self.player_symbol == PLAYER_X else 'O'} | Așteaptă start joc")
+
+    def on_room_info(self, msg):
+        self.players_listbox.delete(0, tk.END)
+        for p_info in msg["players_info"]:
+            status = "✓" if p_info["is_ready"] else "○"
+            symbol_display = 'X' if p_info['symbol'] == PLAYER_X else ('O' if p_info['symbol'] == PLAYER_O else '?')
+            self.players_listbox.insert(tk.END, f"{status} {p_info['name']} ({symbol_display})")
+
+    def on_chat(self, msg):
+        self.append_chat(f"{msg['player']}: {msg['message']}")
+
+    def on_ready_status(self, msg):
+        self.append_chat(f"{msg['player']} este gata!")
+
+    def on_init(self, msg):
+        logger.debug("[CLIENT %s] INIT message received with data: %s", self.name, msg)
+        self.game_active = True
+        self.is_my_turn = msg["is_my_turn"]
+        self.player_symbol = msg["player_symbol"]
+        self.set_board(msg.get("board") or {})
+
+        self.invalidate_board()
+        self.append_chat("Jocul începe!")
+
+        turn_text = "Rândul tău!" if self.is_my_turn else f"Rândul lui {msg.get('current_turn_player_name', 'adversarul')}"
+        self.update_info_bar(
+            f"{self.name} | Camera: {self.room_id} | Jucător: {'X' if self.player_symbol == PLAYER_X else 'O'} | {turn_text}")
+        self.ready_btn.config(state='disabled')
+
+        logger.info("[CLIENT %s] INIT processed. Game active: %s, My turn: %s, My symbol: %s",
+                    self.name, self.game_active, self.is_my_turn, self.player_symbol)
+
+    def on_update(self, msg):
+        logger.debug("[CLIENT %s] UPDATE received: x=%s, y=%s, player_symbol=%s, is_my_turn=%s",
+                     self.name, msg["x"], msg["y"], msg["player_symbol"], msg["is_my_turn"])
+
+        if not self.confirm_pending_move(msg["x"], msg["y"], msg["player_symbol"]):
+            self.add_piece(msg["x"], msg["y"], msg["player_symbol"])
+        self.is_my_turn = msg["is_my_turn"]
+
+        logger.debug("[CLIENT %s] Board updated. My turn now: %s, %d pieces on the board",
+                     self.name, self.is_my_turn, len(self.occupied))
+
+        turn_text = "Rândul tău!" if self.is_my_turn else f"Rândul lui {msg.get('turn', 'adversarul')}"
+        self.update_info_bar(
+            f"{self.name} | Camera: {self.room_id} | Jucător: {'X' if self.player_symbol == PLAYER_X else 'O'} | {turn_text}")
+
+    def on_win(self, msg):
+        logger.info("[CLIENT %s] WIN received: winner=%s", self.name, msg["winner"])
+
+        if msg["x"] != -1 and msg["y"] != -1 and not self.confirm_pending_move(msg["x"], msg["y"],
+                                                                                msg["player_symbol"]):
+            self.add_piece(msg["x"], msg["y"], msg["player_symbol"])
+
+        winner = msg["winner"]
+        self.append_chat(f"{winner} a câștigat!")
+        self.game_active = False
+        self.is_my_turn = False
 
-            self.draw_board()
-            winner = msg["winner"]
-            self.append_chat(f"{winner} a câștigat!")
-            self.game_active = False
-            self.is_my_turn = False
-
-            self.update_info_bar(
-                f"{self.name} | Camera: {self.room_id} | Jucător: {'X' if self.player_symbol == PLAYER_X else 'O'} | {winner} a câștigat!")
-            messagebox.showinfo("Final", f"{winner} a câștigat!", parent=self.root)
-
-            self.ready_btn.config(state='normal', text="✅ Sunt gata")
-            self.is_ready = False
-            self.board.clear()
-            self.draw_board()
+        self.update_info_bar(
+            f"{self.name} | Camera: {self.room_id} | Jucător: {'X' if self.player_symbol == PLAYER_X else 'O'} | {winner} a câștigat!")
+        messagebox.showinfo("Final", f"{winner} a câștigat!", parent=self.root)
 
-        elif msg["type"] == "error":
-            self.show_error(msg["message"])
-            print(f"[CLIENT {self.name}] Error received: {msg['message']}")
+        self.ready_btn.config(state='normal', text="✅ Sunt gata")
+        self.is_ready = False
+        self.set_board({})
+        self.invalidate_board()
+
+    def on_error(self, msg):
+        # Once a game starts the server only sends errors to reject a move, so the
+        # oldest predicted move is taken back before the error is shown. Only a bad
+        # cell leaves the turn with us; other rejections mean it was never ours.
+        if self._pending_moves:
+            x, y, player_symbol = self._pending_moves.popleft()
+            self.remove_piece(x, y, player_symbol)
+            if msg["message"] == ERROR_INVALID_MOVE:
+                self.is_my_turn = True
+        self.show_error(msg["message"])
+        logger.warning("[CLIENT %s] Error received: %s", self.name, msg["message"])
 
     def draw_board(self):
-        self.canvas.delete("all")
+        # Grid, label and piece items are pooled and get re-placed below, so a rebuild
+        # or a new game allocates no fresh Tk items.
+        self.release_pieces()
+        self._last_view = None
 
-        canvas_width = self.canvas.winfo_width()
-        canvas_height = self.canvas.winfo_height()
+        canvas_width, canvas_height = self._canvas_size
 
         if canvas_width <= 1 or canvas_height <= 1:
-            print(f"[CLIENT {self.name}] DEBUG: Canvas size invalid ({canvas_width}x{canvas_height}), skipping draw.")
+            logger.debug("[CLIENT %s] Canvas size invalid (%sx%s), skipping draw.",
+                         self.name, canvas_width, canvas_height)
             return
 
-        current_cell_size = self.cell_size * self.zoom_level
+        current_cell_size = self._step
+
+        logger.debug("[CLIENT %s] draw_board called. Board has %d pieces, cell size: %s, offset: (%s, %s)",
+                     self.name, len(self.occupied), current_cell_size, self.offset_x, self.offset_y)
 
-        start_col = math.floor((-self.offset_x) / current_cell_size)
-        end_col = math.ceil((canvas_width - self.offset_x) / current_cell_size)
-        start_row = math.floor((-self.offset_y) / current_cell_size)
-        end_row = math.ceil((canvas_height - self.offset_y) / current_cell_size)
+        self.draw_grid(canvas_width, canvas_height, current_cell_size)
+        self.draw_labels(canvas_width, canvas_height, current_cell_size)
+        pieces_drawn = self.draw_visible_pieces(canvas_width, canvas_height, current_cell_size)
+        self._last_view = (self.offset_x, self.offset_y, self._step)
 
-        print(f"[CLIENT {self.name}] DEBUG: draw_board called. Board has {len(self.board)} pieces")
-        print(
-            f"[CLIENT {self.name}] DEBUG: current_cell_size: {current_cell_size}, offset_x: {self.offset_x}, offset_y: {self.offset_y}")
-        print(f"[CLIENT {self.name}] DEBUG: Visible cols: {start_col}-{end_col}, rows: {start_row}-{end_row}")
+        logger.debug("[CLIENT %s] Drew %d pieces out of %d total", self.name, pieces_drawn, len(self.occupied))
 
-        for col in range(start_col - 1, end_col + 1):
-            canvas_x = self.offset_x + col * current_cell_size
-            self.canvas.create_line(canvas_x, 0, canvas_x, canvas_height, fill="#e0e0e0", width=1)
-            if col % 5 == 0:
-                self.canvas.create_text(canvas_x, 10, text=str(col), fill="gray", font=("Arial", 8))
+    def request_redraw(self):
+        # Motion and wheel events can arrive faster than frames are drawn; they only
+        # update the view state, and one redraw per idle cycle catches the canvas up.
+        if not self._redraw_scheduled:
+            self._redraw_scheduled = True
+            self.root.after_idle(self._do_redraw)
 
-        for row in range(start_row - 1, end_row + 1):
-            canvas_y = self.offset_y + row * current_cell_size
-            self.canvas.create_line(0, canvas_y, canvas_width, canvas_y, fill="#e0e0e0", width=1)
-            if row % 5 == 0:
-                self.canvas.create_text(10, canvas_y, text=str(row), fill="gray", font=("Arial", 8))
+    def invalidate_board(self):
+        # The next scheduled redraw rebuilds the canvas from scratch; messages that
+        # replace the board during one drain then share a single rebuild.
+        self._last_view = None
+        self.request_redraw()
 
+    def _do_redraw(self):
+        self._redraw_scheduled = False
+        self.pan_board()
+
+    def pan_board(self):
+        if self._last_view is None or self._last_view[2] != self._step:
+            self.draw_board()
+            return
+
+        dx = self.offset_x - self._last_view[0]
+        dy = self.offset_y - self._last_view[1]
+        canvas_width, canvas_height = self._canvas_size
+        current_cell_size = self._step
+
+        # Items already on the canvas keep their relative positions, so a pan only
+        # translates them; just the labels and the pieces revealed at the edges are new.
+        self.canvas.move("piece", dx, dy)
+        origin_x = self.offset_x % self._grid_tile - self._grid_tile
+        origin_y = self.offset_y % self._grid_tile - self._grid_tile
+        self.canvas.move("grid", origin_x - self._grid_origin[0], origin_y - self._grid_origin[1])
+        self._grid_origin = (origin_x, origin_y)
+        self.draw_labels(canvas_width, canvas_height, current_cell_size)
+        self.draw_visible_pieces(canvas_width, canvas_height, current_cell_size)
+        self._last_view = (self.offset_x, self.offset_y, self._step)
+
+    def draw_grid(self, canvas_width, canvas_height, cell_size):
+        # The grid is a single tile of whole cells, rasterized once per step and
+        # repeated across the canvas. A pan shifts every tile by the same phase change,
+        # so it stays one move on the 'grid' tag; a resize only adds or drops tiles.
+        image, tile = self.grid_tile(cell_size)
+        origin_x = self.offset_x % tile - tile
+        origin_y = self.offset_y % tile - tile
+        cols = -(-(canvas_width + tile) // tile)
+        rows = -(-(canvas_height + tile) // tile)
+
+        items = self._grid_items
+        for item in items[cols * rows:]:
+            self.canvas.delete(item)
+        del items[cols * rows:]
+        tk_call, path = self._tk_call, self._canvas_path
+        for i in range(cols * rows):
+            x = origin_x + i % cols * tile
+            y = origin_y + i // cols * tile
+            if i < len(items):
+                tk_call(path, "coords", items[i], x, y)
+                tk_call(path, "itemconfigure", items[i], "-image", image)
+            else:
+                items.append(self.canvas.create_image(x, y, anchor='nw', image=image, tags="grid"))
+        self.canvas.tag_lower("grid")
+        self._grid_origin = (origin_x, origin_y)
+
+    def grid_tile(self, cell_size):
+        if cell_size != self._grid_step:
+            tile = -(-GRID_TILE_SIZE // cell_size) * cell_size
+            image = Image.new("RGB", (tile, tile), "white")
+            line = ImageDraw.Draw(image).line
+            for pos in range(0, tile, cell_size):
+                line([(pos, 0), (pos, tile)], fill=GRID_COLOR, width=1)
+                line([(0, pos), (tile, pos)], fill=GRID_COLOR, width=1)
+
+            self._grid_img = ImageTk.PhotoImage(image, master=self.canvas)
+            self._grid_tile = tile
+            self._grid_step = cell_size
+        return self._grid_img, self._grid_tile
+
+    def visible_cells(self, canvas_width, canvas_height, cell_size):
+        # The labels, the piece pass and every single-piece update ask for the same
+        # range until the view changes, so it is computed once per view.
+        key = (self.offset_x, self.offset_y, cell_size, canvas_width, canvas_height)
+        if key != self._visible_key:
+            start_col = -self.offset_x // cell_size
+            end_col = -((self.offset_x - canvas_width) // cell_size)
+            start_row = -self.offset_y // cell_size
+            end_row = -((self.offset_y - canvas_height) // cell_size)
+            self._visible = (start_col, end_col, start_row, end_row)
+            self._visible_key = key
+        return self._visible
+
+    def draw_labels(self, canvas_width, canvas_height, cell_size):
+        start_col, end_col, start_row, end_row = self.visible_cells(canvas_width, canvas_height, cell_size)
+
+        self.place_labels(self._col_labels,
+                          [(canvas_x, 10, col) for col, canvas_x in
+                           grid_positions(self.offset_x, cell_size, start_col - 1, end_col, LABEL_EVERY)])
+        self.place_labels(self._row_labels,
+                          [(10, canvas_y, row) for row, canvas_y in
+                           grid_positions(self.offset_y, cell_size, start_row - 1, end_row, LABEL_EVERY)])
+
+        self.canvas.tag_raise("label", "grid")
+
+    def place_labels(self, pool, placements):
+        # Label items survive pans: each is moved only if its spot changed and only has
+        # its text rewritten when the number changes; spare items are hidden, not deleted.
+        # A pan along one axis therefore leaves the other axis' labels untouched.
+        canvas = self.canvas
+        tk_call, path = self._tk_call, self._canvas_path
+        for i, (x, y, index) in enumerate(placements):
+            text = str(index)
+            if i == len(pool):
+                pool.append([canvas.create_text(x, y, text=text, fill=LABEL_COLOR, font=self.label_font,
+                                                tags="label"), text, (x, y)])
+                continue
+            label = pool[i]
+            if label[2] != (x, y):
+                tk_call(path, "coords", label[0], x, y)
+                label[2] = (x, y)
+            if label[1] != text:
+                tk_call(path, "itemconfigure", label[0], "-text", text, "-state", "normal")
+                label[1] = text
+        for label in pool[len(placements):]:
+            if label[1] is not None:
+                tk_call(path, "itemconfigure", label[0], "-state", "hidden")
+                label[1] = None
+
+    def draw_visible_pieces(self, canvas_width, canvas_height, cell_size):
+        # Pieces are kept grouped by symbol so each pass hoists the symbol's draw
+        # routine and never branches on the symbol per piece. Within a symbol they
+        # are bucketed into square blocks of cells, and only the blocks overlapping
+        # the view are visited, so the cost follows the visible pieces, not the board.
+        start_col, end_col, start_row, end_row = self.visible_cells(canvas_width, canvas_height, cell_size)
+        bucket_cols = range(start_col >> BUCKET_SHIFT, ((end_col - 1) >> BUCKET_SHIFT) + 1)
+        bucket_rows = range(start_row >> BUCKET_SHIFT, ((end_row - 1) >> BUCKET_SHIFT) + 1)
+        offset_x, offset_y = self.offset_x, self.offset_y
+        piece_items = self.piece_items
+        create_piece = self.create_piece
         pieces_drawn = 0
-        for (x, y), player_symbol in self.board.items():
-            px = self.offset_x + x * current_cell_size
-            py = self.offset_y + y * current_cell_size
-
-            if px + current_cell_size > 0 and px < canvas_width and \
-                    py + current_cell_size > 0 and py < canvas_height:
-
-                color = "#4285F4" if player_symbol == PLAYER_X else "#EA4335"
-                outline = "#3367D6" if player_symbol == PLAYER_X else "#D33426"
-
-                padding = 3 * self.zoom_level
-                line_width = max(1, int(3 * self.zoom_level))
-
-                if player_symbol == PLAYER_O:
-                    self.canvas.create_oval(px + padding, py + padding,
-                                            px + current_cell_size - padding, py + current_cell_size - padding,
-                                            fill=color, outline=outline, width=max(1, int(2 * self.zoom_level)))
-                    print(f"[CLIENT {self.name}] DEBUG: Drawn O at ({x},{y}) on canvas ({px},{py})")
-                else:
-                    self.canvas.create_line(px + padding, py + padding,
-                                            px + current_cell_size - padding, py + current_cell_size - padding,
-                                            fill=color, width=line_width)
-                    self.canvas.create_line(px + current_cell_size - padding, py + padding,
-                                            px + padding, py + current_cell_size - padding,
-                                            fill=color, width=line_width)
-                    print(f"[CLIENT {self.name}] DEBUG: Drawn X at ({x},{y}) on canvas ({px},{py})")
-                pieces_drawn += 1
-
-        print(f"[CLIENT {self.name}] DEBUG: Drew {pieces_drawn} pieces out of {len(self.board)} total")
+        for player_symbol, buckets in self.pieces.items():
+            image = self.glyph(player_symbol, cell_size)
+            for bx in bucket_cols:
+                for by in bucket_rows:
+                    cells = buckets.get((bx, by))
+                    if not cells:
+                        continue
+                    for x, y in cells:
+                        if not (start_col <= x < end_col and start_row <= y < end_row) or (x, y) in piece_items:
+                            continue
+                        piece_items[(x, y)] = create_piece(offset_x + x * cell_size, offset_y + y * cell_size, image)
+                        pieces_drawn += 1
+        return pieces_drawn
+
+    def draw_piece(self, x, y, player_symbol, canvas_width, canvas_height, cell_size):
+        start_col, end_col, start_row, end_row = self.visible_cells(canvas_width, canvas_height, cell_size)
+        if not (start_col <= x < end_col and start_row <= y < end_row):
+            return False
+
+        self.piece_items[(x, y)] = self.create_piece(self.offset_x + x * cell_size, self.offset_y + y * cell_size,
+                                                     self.glyph(player_symbol, cell_size))
+        return True
+
+    def glyph(self, player_symbol, cell_size):
+        # X and O are rasterized once per zoom level and stamped with create_image,
+        # one item per piece instead of two lines or an outlined oval.
+        if cell_size != self._glyph_size:
+            self._glyphs = {PLAYER_X: self.render_x(cell_size), PLAYER_O: self.render_o(cell_size)}
+            self._glyph_size = cell_size
+        return self._glyphs[player_symbol]
+
+    def render_glyph(self, cell_size, paint):
+        # Drawn at GLYPH_SUPERSAMPLE times the size and scaled down for anti-aliasing.
+        size = cell_size
+        scale = GLYPH_SUPERSAMPLE
+        image = Image.new("RGBA", (size * scale, size * scale), (0, 0, 0, 0))
+        paint(ImageDraw.Draw(image), size * scale, 3 * size * scale / self.cell_size, scale)
+        return ImageTk.PhotoImage(image.resize((size, size), Image.LANCZOS), master=self.canvas)
+
+    def render_x(self, cell_size):
+        line_width = max(1, 3 * cell_size // self.cell_size)
+
+        def paint(draw, size, padding, scale):
+            draw.line([(padding, padding), (size - padding, size - padding)], fill=X_COLOR,
+                      width=line_width * scale)
+            draw.line([(size - padding, padding), (padding, size - padding)], fill=X_COLOR,
+                      width=line_width * scale)
+
+        return self.render_glyph(cell_size, paint)
+
+    def render_o(self, cell_size):
+        outline_width = max(1, 2 * cell_size // self.cell_size)
+
+        def paint(draw, size, padding, scale):
+            draw.ellipse([padding, padding, size - padding, size - padding], fill=O_FILL, outline=O_OUTLINE,
+                         width=outline_width * scale)
+
+        return self.render_glyph(cell_size, paint)
+
+    def release_pieces(self):
+        self._tk_call(self._canvas_path, "itemconfigure", "piece", "-state", "hidden")
+        self._free_pieces.extend(self.piece_items.values())
+        self.piece_items.clear()
+
+    def create_piece(self, px, py, image):
+        if self._free_pieces:
+            item = self._free_pieces.pop()
+            self._tk_call(self._canvas_path, "coords", item, px, py)
+            self._tk_call(self._canvas_path, "itemconfigure", item, "-image", image, "-state", "normal")
+            return item
+        return self._tk_call(self._canvas_path, "create", "image", px, py, "-anchor", "nw", "-image", image,
+                             "-tags", "piece")
+
+    def set_board(self, board):
+        # The full board only arrives with 'init'; it is split into the per-symbol
+        # buckets once here, and hit tests use the flat set of occupied cells.
+        self._pending_moves.clear()
+        self.pieces = {PLAYER_X: {}, PLAYER_O: {}}
+        for (x, y), player_symbol in board.items():
+            self.pieces[player_symbol].setdefault((x >> BUCKET_SHIFT, y >> BUCKET_SHIFT), set()).add((x, y))
+        self.occupied = {pack_key(x, y) for x, y in board}
+
+    def add_piece(self, x, y, player_symbol):
+        self.occupied.add(pack_key(x, y))
+        self.pieces[player_symbol].setdefault((x >> BUCKET_SHIFT, y >> BUCKET_SHIFT), set()).add((x, y))
+        if self._last_view != (self.offset_x, self.offset_y, self._step):
+            self.request_redraw()
+            return
+        self.draw_piece(x, y, player_symbol, *self._canvas_size, self._step)
+
+    def remove_piece(self, x, y, player_symbol):
+        self.occupied.discard(pack_key(x, y))
+        self.pieces[player_symbol].get((x >> BUCKET_SHIFT, y >> BUCKET_SHIFT), set()).discard((x, y))
+        item = self.piece_items.pop((x, y), None)
+        if item is not None:
+            self._tk_call(self._canvas_path, "itemconfigure", item, "-state", "hidden")
+            self._free_pieces.append(item)
+
+    def confirm_pending_move(self, x, y, player_symbol):
+        if self._pending_moves and self._pending_moves[0] == (x, y, player_symbol):
+            self._pending_moves.popleft()
+            return True
+        return False
 
     def on_canvas_resize(self, event):
-        self.draw_board()
+        # <Configure> also fires for moves and restacking; only a new size needs a redraw.
+        # The size is kept here so drawing never has to query it from Tk.
+        size = (event.width, event.height)
+        if size == self._canvas_size:
+            return
+        self._canvas_size = size
+        self.invalidate_board()
 
     def on_canvas_press(self, event):
         self.is_dragging = True
@@ -303,6 +706,8 @@ class GameClient:
         if self.is_dragging:
             dx = event.x - self.last_mouse_x
             dy = event.y - self.last_mouse_y
+            if dx == 0 and dy == 0:
+                return
 
             if abs(event.x - self.mouse_press_x) > self.drag_threshold or abs(
                     event.y - self.mouse_press_y) > self.drag_threshold:
@@ -312,15 +717,14 @@ class GameClient:
             self.offset_y += dy
             self.last_mouse_x = event.x
             self.last_mouse_y = event.y
-            self.draw_board()
+            self.request_redraw()
 
     def on_canvas_release(self, event):
         if self.is_dragging:
             if not self.has_dragged:
-                current_cell_size = self.cell_size * self.zoom_level
-                x_logical = math.floor((event.x - self.offset_x) / current_cell_size)
-                y_logical = math.floor((event.y - self.offset_y) / current_cell_size)
-                print(f"[CLIENT {self.name}] Click detected at logical position ({x_logical}, {y_logical})")
+                x_logical = (event.x - self.offset_x) // self._step
+                y_logical = (event.y - self.offset_y) // self._step
+                logger.debug("[CLIENT %s] Click detected at logical position (%s, %s)", self.name, x_logical, y_logical)
                 self.click_logic(x_logical, y_logical)
 
             self.is_dragging = False
@@ -336,28 +740,35 @@ class GameClient:
         elif event.num == 4:
             zoom_factor = 1.1
 
-        old_zoom = self.zoom_level
-        self.zoom_level = max(0.2, min(3.0, self.zoom_level * zoom_factor))
+        zoom_level = max(0.2, min(3.0, self.zoom_level * zoom_factor))
+        if zoom_level == self.zoom_level:
+            return
+
+        old_step = self._step
+        self.zoom_level = zoom_level
+        # The step is kept in whole pixels and the offsets are snapped to match, so
+        # all per-cell coordinate math stays in integers and lines land on pixels.
+        # The float zoom level only accumulates wheel ticks; a tick that rounds to
+        # the same step leaves the view, and everything drawn for it, untouched.
+        self._step = max(1, round(self.cell_size * self.zoom_level))
+        if self._step == old_step:
+            return
 
         mouse_x = event.x
         mouse_y = event.y
 
-        logical_x_at_mouse = (mouse_x - self.offset_x) / old_zoom / self.cell_size
-        logical_y_at_mouse = (mouse_y - self.offset_y) / old_zoom / self.cell_size
+        logical_x_at_mouse = (mouse_x - self.offset_x) / old_step
+        logical_y_at_mouse = (mouse_y - self.offset_y) / old_step
 
-        self.offset_x = mouse_x - logical_x_at_mouse * self.zoom_level * self.cell_size
-        self.offset_y = mouse_y - logical_y_at_mouse * self.zoom_level * self.cell_size
+        self.offset_x = round(mouse_x - logical_x_at_mouse * self._step)
+        self.offset_y = round(mouse_y - logical_y_at_mouse * self._step)
 
-        self.draw_board()
+        self.request_redraw()
 
     def click_logic(self, x_logical, y_logical):
-        print(f"[CLIENT {self.name}] Click logic called:")
-        print(f"  Position: ({x_logical},{y_logical})")
-        print(f"  Game active: {self.game_active}")
-        print(f"  Is ready: {self.is_ready}")
-        print(f"  My turn: {self.is_my_turn}")
-        print(f"  Player symbol: {self.player_symbol}")
-        print(f"  Cell occupied: {(x_logical, y_logical) in self.board}")
+        logger.debug("[CLIENT %s] Click logic called: position (%s,%s), game active: %s, ready: %s, my turn: %s, "
+                     "symbol: %s", self.name, x_logical, y_logical, self.game_active, self.is_ready, self.is_my_turn,
+                     self.player_symbol)
 
         if not self.game_active:
             self.update_info_bar("Jocul nu este activ încă!")
@@ -379,51 +790,44 @@ class GameClient:
             self.append_chat("DEBUG: Nu este rândul tău!")
             return
 
-        if (x_logical, y_logical) in self.board:
+        if pack_key(x_logical, y_logical) in self.occupied:
             self.update_info_bar("Celulă deja ocupată!")
             self.append_chat("DEBUG: Celulă ocupată!")
             return
 
-        print(f"[CLIENT {self.name}] Sending valid move to server")
-        try:
-            self.sock.sendall(pickle.dumps({
-                "type": "move",
-                "x": x_logical,
-                "y": y_logical,
-                "player_symbol": self.player_symbol
-            }))
-
-            self.update_info_bar(
-                f"{self.name} | Camera: {self.room_id} | Jucător: {'X' if self.player_symbol == PLAYER_X else 'O'} | Așteaptă...")
-            self.append_chat(f"Ai făcut mutarea la ({x_logical}, {y_logical})")
-            print(f"[CLIENT {self.name}] Move sent successfully to server")
-
-        except Exception as e:
-            self.show_error(f"Eroare la trimiterea mutării: {e}")
-            print(f"[CLIENT {self.name}] Error sending move: {e}")
+        if not self.send_message({
+            "type": "move",
+            "x": x_logical,
+            "y": y_logical,
+            "player_symbol": self.player_symbol
+        }):
+            return
+
+        # The piece is shown right away instead of after the server's round trip;
+        # the echoed update confirms it and an error reply takes it back.
+        self._pending_moves.append((x_logical, y_logical, self.player_symbol))
+        self.add_piece(x_logical, y_logical, self.player_symbol)
+        self.is_my_turn = False
+
+        self.update_info_bar(
+            f"{self.name} | Camera: {self.room_id} | Jucător: {'X' if self.player_symbol == PLAYER_X else 'O'} | Așteaptă...")
+        self.append_chat(f"Ai făcut mutarea la ({x_logical}, {y_logical})")
+        logger.info("[CLIENT %s] Move sent to server: (%s, %s)", self.name, x_logical, y_logical)
 
     def send_ready(self):
-        if self.is_ready:
+        if self.is_ready or not self.send_message({"type": "ready", "player_name": self.name}):
             return
 
         self.is_ready = True
-        try:
-            self.sock.sendall(pickle.dumps({"type": "ready", "player_name": self.name}))
-            self.ready_btn.config(state='disabled', text="✓ Gata")
-            self.update_info_bar("Așteaptă ca adversarul să fie gata...")
-            self.append_chat("Ai marcat că ești gata!")
-            print(f"[CLIENT {self.name}] Sent ready message. is_ready = True.")
-        except Exception as e:
-            self.show_error(f"Eroare la trimiterea ready: {e}")
+        self.ready_btn.config(state='disabled', text="✓ Gata")
+        self.update_info_bar("Așteaptă ca adversarul să fie gata...")
+        self.append_chat("Ai marcat că ești gata!")
+        logger.info("[CLIENT %s] Sent ready message.", self.name)
 
     def send_chat(self, event=None):
         text = self.entry.get().strip()
-        if text:
-            try:
-                self.sock.sendall(pickle.dumps({"type": "chat", "message": text, "player_name": self.name}))
-                self.entry.delete(0, tk.END)
-            except Exception as e:
-                self.show_error(f"Eroare la trimiterea mesajului: {e}")
+        if text and self.send_message({"type": "chat", "message": text, "player_name": self.name}):
+            self.entry.delete(0, tk.END)
 
     def append_chat(self, text):
         self.chat_area.config(state='normal')
@@ -1,7 +1,7 @@
-import uuid
+import secrets
 from typing import Dict, Optional, Tuple, List, Set
-from dataclasses import dataclass
-from enum import Enum
+from dataclasses import dataclass, field
+from enum import Enum, IntEnum
 import logging
 import time
 
@@ -9,6 +9,33 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+KEY_SHIFT = 32
+_Y_BIAS = 1 << 31
+_Y_MASK = (1 << KEY_SHIFT) - 1
+# Keys only stay distinct while both coordinates fit a signed 32-bit int.
+COORD_MIN = -_Y_BIAS
+COORD_MAX = _Y_BIAS
+
+
+def pack_key(x: int, y: int) -> int:
+    # Packs a cell into one int, x in the high bits and y in the low 32. The packing
+    # is linear, so a neighbour's key is this key plus pack_key(dx, dy).
+    return (x << KEY_SHIFT) + y
+
+
+def unpack_key(key: int) -> Tuple[int, int]:
+    y = ((key + _Y_BIAS) & _Y_MASK) - _Y_BIAS
+    return (key - y) >> KEY_SHIFT, y
+
+
+# Each line through a cell as one direction, walked both ways, with its packed-key
+# stride precomputed.
+WIN_DIRECTIONS = tuple(
+    (dx, dy, pack_key(dx, dy))
+    for dx, dy in ((0, 1), (1, 0), (1, 1), (1, -1))
+)
+
+
 class GameError(Exception):
     pass
 
@@ -21,86 +48,107 @@ class GameStateError(GameError):
     pass
 
 
-class PlayerSymbol(str, Enum):
-    X = "X"
-    O = "O"
+class PlayerSymbol(IntEnum):
+    # Symbols are small ints that index the per-symbol tables on a room; the name
+    # ("X" or "O") is what goes over the wire.
+    X = 0
+    O = 1
+
+
+SYMBOLS = tuple(PlayerSymbol)
+SYMBOL_NAMES = tuple(symbol.name for symbol in SYMBOLS)
+
+
+class GameStatus(Enum):
+    # A room only ever moves forward: WAITING until the second player joins,
+    # ACTIVE while moves are accepted, OVER once someone has won.
+    WAITING = "waiting"
+    ACTIVE = "active"
+    OVER = "over"
+
+
+def new_boards() -> Tuple[Set[int], ...]:
+    # The packed keys owned by each symbol, one set per symbol.
+    return tuple(set() for _ in SYMBOLS)
+
+
+def new_runs() -> Tuple[Tuple[Dict[int, Tuple[int, int]], ...], ...]:
+    # One dict per symbol and line, mapping the packed key at either end of a run of
+    # that symbol, and the piece that last grew it, to the run's (low, high) end keys.
+    # Cells inside a run keep stale values; a new piece only ever touches run ends,
+    # since the cells next to it were empty before.
+    return tuple(tuple({} for _ in WIN_DIRECTIONS) for _ in SYMBOLS)
 
 
-@dataclass
+@dataclass(slots=True)
 class Player:
     name: str
     symbol: PlayerSymbol
     client_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class GameRoom:
     id: str
     players: Dict[str, Player]
-    board: Dict[Tuple[int, int], PlayerSymbol]
     current_turn: str
-    is_game_over: bool = False
+    status: GameStatus = GameStatus.WAITING
     winner: Optional[str] = None
     last_move: Optional[Tuple[int, int]] = None
     created_at: float = 0.0
-
-    def validate_state(self) -> bool:
-        if len(self.players) > 2:
-            return False
-        if self.is_game_over and not self.winner:
-            return False
-        return True
+    turn_order: Tuple[str, ...] = ()
+    turn_index: int = 0
+    symbols_taken: Set[PlayerSymbol] = field(default_factory=set)
+    boards: Tuple[Set[int], ...] = field(default_factory=new_boards)
+    cell_count: int = 0
+    min_x: Optional[int] = None
+    max_x: Optional[int] = None
+    min_y: Optional[int] = None
+    max_y: Optional[int] = None
+    # Last get_room_state result, dropped whenever the room changes.
+    state_cache: Optional[Dict] = field(default=None, repr=False)
+    runs: Tuple[Tuple[Dict[int, Tuple[int, int]], ...], ...] = field(default_factory=new_runs)
+
+
+def _record_runs(room: GameRoom, key: int, y: int, symbol: PlayerSymbol) -> None:
+    # Joins the runs on either side of a new piece into one, so every line costs
+    # two lookups and three stores instead of a scan. A stride that would step y past
+    # the 32-bit range lands on the next column's key instead, so it is not probed.
+    for axis_runs, (_, dy, stride) in zip(room.runs[symbol], WIN_DIRECTIONS):
+        before = axis_runs.get(key - stride) if COORD_MIN <= y - dy < COORD_MAX else None
+        after = axis_runs.get(key + stride) if COORD_MIN <= y + dy < COORD_MAX else None
+        ends = (before[0] if before else key, after[1] if after else key)
+        axis_runs[ends[0]] = axis_runs[ends[1]] = axis_runs[key] = ends
 
 
 def get_winning_positions(room: GameRoom, last_x: int, last_y: int) -> Optional[List[Tuple[int, int]]]:
-    if (last_x, last_y) not in room.board:
+    # Only reads the run tables that make_move keeps, so it can be asked again
+    # about the last move and give the same answer.
+    last_key = pack_key(last_x, last_y)
+    x_cells, o_cells = room.boards
+    if last_key in x_cells:
+        symbol = PlayerSymbol.X
+    elif last_key in o_cells:
+        symbol = PlayerSymbol.O
+    else:
         return None
 
-    symbol = room.board[(last_x, last_y)]
-
-    directions = [
-        [(0, 1), (0, -1)],
-        [(1, 0), (-1, 0)],
-        [(1, 1), (-1, -1)],
-        [(1, -1), (-1, 1)]
-    ]
-
-    for dir_pair in directions:
-        positions = [(last_x, last_y)]
-
-        for dx, dy in dir_pair:
-            x, y = last_x, last_y
-            count = 1
-            while True:
-                x += dx
-                y += dy
-                if (x, y) not in room.board or room.board[(x, y)] != symbol:
-                    break
-                positions.append((x, y))
-                count += 1
-
-        if len(positions) >= 5:
-            return positions
+    for axis_runs, (dx, dy, stride) in zip(room.runs[symbol], WIN_DIRECTIONS):
+        low, high = axis_runs.get(last_key, (last_key, last_key))
+        if high - low >= 4 * stride:
+            return [(last_x + dx * i, last_y + dy * i)
+                    for i in range((low - last_key) // stride, (high - last_key) // stride + 1)]
 
     return None
 
 
 def check_draw_condition(room: GameRoom) -> bool:
-    if not room.board:
+    if not room.cell_count:
         return False
 
-    x_coords = [x for x, _ in room.board.keys()]
-    y_coords = [y for _, y in room.board.keys()]
-
-    min_x, max_x = min(x_coords), max(x_coords)
-    min_y, max_y = min(y_coords), max(y_coords)
-
-    for x in range(min_x, max_x + 1):
-        for y in range(min_y, max_y + 1):
-            if (x, y) not in room.board:
-                return False
-
-    return True
+    # Cells are never removed, so the bounding box is full exactly when it holds as
+    # many cells as have been played.
+    return room.cell_count == (room.max_x - room.min_x + 1) * (room.max_y - room.min_y + 1)
 
 
 def check_win_condition(room: GameRoom, last_x: int, last_y: int) -> Dict:
@@ -114,25 +162,40 @@ def check_win_condition(room: GameRoom, last_x: int, last_y: int) -> Dict:
 
 
 def make_move(room: GameRoom, player: Player, x: int, y: int) -> Dict:
-    if not room.validate_state():
-        raise GameStateError("Invalid game state")
-
-    if room.is_game_over:
-        raise InvalidMoveError("Game is over")
+    if room.status is not GameStatus.ACTIVE:
+        if room.status is GameStatus.OVER:
+            raise InvalidMoveError("Game is over")
+        raise InvalidMoveError("Game has not started")
 
     if player.name != room.current_turn:
         raise InvalidMoveError("Not your turn")
 
-    if (x, y) in room.board:
+    if not (COORD_MIN <= x < COORD_MAX and COORD_MIN <= y < COORD_MAX):
+        raise InvalidMoveError("Position out of range")
+
+    key = pack_key(x, y)
+    x_cells, o_cells = room.boards
+    if key in x_cells or key in o_cells:
         raise InvalidMoveError("Position already taken")
 
-    room.board[(x, y)] = player.symbol
+    room.boards[player.symbol].add(key)
+    _record_runs(room, key, y, player.symbol)
+    room.state_cache = None
+    if room.cell_count:
+        room.min_x = min(room.min_x, x)
+        room.max_x = max(room.max_x, x)
+        room.min_y = min(room.min_y, y)
+        room.max_y = max(room.max_y, y)
+    else:
+        room.min_x = room.max_x = x
+        room.min_y = room.max_y = y
+    room.cell_count += 1
     room.last_move = (x, y)
 
     win_result = check_win_condition(room, x, y)
 
     if win_result["is_win"]:
-        room.is_game_over = True
+        room.status = GameStatus.OVER
         room.winner = player.name
         return {
             "success": True,
@@ -142,8 +205,8 @@ def make_move(room: GameRoom, player: Player, x: int, y: int) -> Dict:
             "is_game_over": True
         }
 
-    other_player = next(p for p in room.players.values() if p.name != player.name)
-    room.current_turn = other_player.name
+    room.turn_index ^= 1
+    room.current_turn = room.turn_order[room.turn_index]
 
     return {
         "success": True,
@@ -158,7 +221,9 @@ def create_room(rooms: Dict[str, GameRoom], player_name: str, client_id: str) ->
     if not player_name or len(player_name) > 20:
         raise ValueError("Invalid player name")
 
-    room_id = str(uuid.uuid4())[:8]
+    room_id = secrets.token_hex(4)
+    while room_id in rooms:
+        room_id = secrets.token_hex(4)
     player = Player(
         name=player_name,
         symbol=PlayerSymbol.X,
@@ -168,34 +233,33 @@ def create_room(rooms: Dict[str, GameRoom], player_name: str, client_id: str) ->
     room = GameRoom(
         id=room_id,
         players={player_name: player},
-        board={},
         current_turn=player_name,
-        created_at=time.time()
+        created_at=time.time(),
+        turn_order=(player_name,),
+        symbols_taken={PlayerSymbol.X}
     )
 
     rooms[room_id] = room
-    logger.info(f"Created room {room_id} with player {player_name}")
+    logger.info("Created room %s with player %s", room_id, player_name)
     return room_id, player
 
 
 def join_room(room: GameRoom, player_name: str, symbol: str, client_id: str) -> Player:
-    if not room.validate_state():
-        raise GameStateError("Invalid room state")
-
-    if len(room.players) >= 2:
+    if room.status is not GameStatus.WAITING:
+        if room.status is GameStatus.OVER:
+            raise GameStateError("Game is over")
         raise ValueError("Room is full")
 
     if player_name in room.players:
         raise ValueError("Player name already taken")
 
     try:
-        player_symbol = PlayerSymbol(symbol)
-    except ValueError:
+        player_symbol = PlayerSymbol[symbol]
+    except KeyError:
         raise ValueError("Invalid symbol")
 
-    for player in room.players.values():
-        if player.symbol == player_symbol:
-            raise ValueError("Symbol already taken")
+    if player_symbol in room.symbols_taken:
+        raise ValueError("Symbol already taken")
 
     player = Player(
         name=player_name,
@@ -203,26 +267,37 @@ def join_room(room: GameRoom, player_name: str, symbol: str, client_id: str) ->
         client_id=client_id
     )
     room.players[player_name] = player
-    logger.info(f"Player {player_name} joined room {room.id}")
+    room.turn_order += (player_name,)
+    room.symbols_taken.add(player_symbol)
+    room.status = GameStatus.ACTIVE
+    room.state_cache = None
+    logger.info("Player %s joined room %s", player_name, room.id)
     return player
 
 
 def get_room_state(room: GameRoom) -> Dict:
-    return {
+    # The returned dict is shared between calls until the next move or join, so
+    # callers must not modify it.
+    if room.state_cache is not None:
+        return room.state_cache
+
+    room.state_cache = {
         "id": room.id,
         "players": {
             name: {
                 "name": player.name,
-                "symbol": player.symbol.value
+                "symbol": SYMBOL_NAMES[player.symbol]
             }
             for name, player in room.players.items()
         },
-        "board": {
-            f"{x},{y}": symbol.value
-            for (x, y), symbol in room.board.items()
-        },
+        "board": [
+            (*unpack_key(key), symbol_name)
+            for symbol_name, cells in zip(SYMBOL_NAMES, room.boards)
+            for key in cells
+        ],
         "current_turn": room.current_turn,
-        "is_game_over": room.is_game_over,
+        "is_game_over": room.status is GameStatus.OVER,
         "winner": room.winner,
         "last_move": room.last_move
-    }
\ No newline at end of file
+    }
+    return room.state_cache
\ No newline at end of file
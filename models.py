@@ -1,27 +1,11 @@
-from dataclasses import dataclass
-from typing import Dict, Optional, Set, Tuple
-from enum import Enum
+from typing import Dict
 
-class PlayerSymbol(Enum):
-    X = "X"
-    O = "O"
-
-@dataclass
-class Player:
-    name: str
-    symbol: PlayerSymbol
-
-@dataclass
-class GameRoom:
-    room_id: str
-    players: Dict[str, Player]
-    board: Dict[Tuple[int, int], PlayerSymbol]
-    current_turn: Optional[str]
-    is_game_over: bool = False
-    winner: Optional[str] = None
+# The room, player and symbol models live in game_logic; they are re-exported here
+# so there is a single definition of each.
+from game_logic import GameRoom, Player, PlayerSymbol
 
 class GameState:
     def __init__(self):
         self.rooms: Dict[str, GameRoom] = {}
         self.player_rooms: Dict[str, str] = {}
-        self.leaderboard: Dict[str, int] = {}
\ No newline at end of file
+        self.leaderboard: Dict[str, int] = {}
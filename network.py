@@ -1,11 +1,17 @@
 import socket
+import selectors
+import sys
 import json
 import struct
 import logging
-from typing import Dict, Optional, Tuple, Any
-from dataclasses import dataclass
+from typing import Dict, Optional, Any, Callable
+from dataclasses import dataclass, field
 import threading
-import queue
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -19,120 +25,280 @@ class Message:
 class NetworkError(Exception):
     pass
 
+HEADER = struct.Struct('!I')
+RECV_BUFFER_SIZE = 65536
+# Lets one recv wait for a whole frame; Windows does not honour it reliably.
+RECV_WAITALL = getattr(socket, 'MSG_WAITALL', 0) if sys.platform != 'win32' else 0
+SELECT_TIMEOUT = 0.5
+# Largest payload a peer may announce; anything bigger is refused before it is buffered.
+MAX_FRAME = 16 * 1024 * 1024
+# Output a client may leave unread before it is disconnected.
+MAX_PENDING_OUTPUT = 4 * MAX_FRAME
+
+@dataclass
+class ClientConnection:
+    client_id: str
+    socket: socket.socket
+    buffer: bytearray = field(default_factory=bytearray)
+    # Bytes the socket would not take yet; flushed once the selector reports it writable.
+    outgoing: bytearray = field(default_factory=bytearray)
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        # json.dumps turns int dict keys into strings; orjson only does with this flag.
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj).encode('utf-8')
+
+
+def _loads(data: bytes) -> Any:
+    """Parse UTF-8 JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 class MessageProtocol:
     @staticmethod
     def pack_message(message: Message) -> bytes:
         """Pack a message into bytes for transmission"""
-        message_bytes = json.dumps({
+        message_bytes = _dumps({
             "type": message.type,
             "data": message.data
-        }).encode('utf-8')
-        length = len(message_bytes)
-        return struct.pack('!I', length) + message_bytes
+        })
+        return HEADER.pack(len(message_bytes)) + message_bytes
 
     @staticmethod
     def unpack_message(data: bytes) -> Message:
         """Unpack bytes into a Message object"""
         try:
-            message_dict = json.loads(data.decode('utf-8'))
+            message_dict = _loads(data)
             return Message(
                 type=message_dict["type"],
                 data=message_dict["data"]
             )
-        except (json.JSONDecodeError, KeyError) as e:
+        except (json.JSONDecodeError, UnicodeDecodeError, KeyError) as e:
             raise NetworkError(f"Invalid message format: {str(e)}")
 
+    @staticmethod
+    def recv_exactly(sock: socket.socket, size: int) -> Optional[bytearray]:
+        """Read exactly `size` bytes straight into one buffer, or return None if the peer closes first"""
+        data = bytearray(size)
+        view = memoryview(data)
+        recv_into = sock.recv_into
+        received = 0
+        while received < size:
+            count = recv_into(view[received:], size - received, RECV_WAITALL)
+            if not count:
+                return None
+            received += count
+        return data
+
+    @staticmethod
+    def read_message(sock: socket.socket) -> Optional[Message]:
+        """Read one length-prefixed message, or return None once the peer closes"""
+        length_data = MessageProtocol.recv_exactly(sock, HEADER.size)
+        if length_data is None:
+            return None
+        length = HEADER.unpack(length_data)[0]
+        if length > MAX_FRAME:
+            raise NetworkError(f"Frame too large: {length} bytes")
+        data = MessageProtocol.recv_exactly(sock, length)
+        if data is None:
+            return None
+        return MessageProtocol.unpack_message(data)
+
 class TCPServer:
     def __init__(self, host: str = 'localhost', port: int = 8765):
         self.host = host
         self.port = port
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.clients: Dict[str, socket.socket] = {}
+        self.clients: Dict[str, ClientConnection] = {}
         self.message_handlers: Dict[str, callable] = {}
         self.running = False
+        # Guards write buffers and selector registrations, which send_message and
+        # broadcast touch from the caller's thread.
+        self.lock = threading.RLock()
 
     def start(self):
-        """Start the TCP server"""
+        """Start the TCP server; every client is served from this one thread.
+        Client sockets are non-blocking, so a client that stops reading only
+        fills its own write buffer instead of stalling the others, and is
+        dropped once that buffer passes MAX_PENDING_OUTPUT. send_message and
+        broadcast may be called from any thread; output they cannot write at
+        once is flushed by this loop within SELECT_TIMEOUT"""
         self.server_socket.bind((self.host, self.port))
         self.server_socket.listen(5)
         self.running = True
-        logger.info(f"Server started on {self.host}:{self.port}")
+        logger.info("Server started on %s:%s", self.host, self.port)
 
-        while self.running:
-            try:
-                client_socket, address = self.server_socket.accept()
-                client_thread = threading.Thread(
-                    target=self._handle_client,
-                    args=(client_socket, address)
-                )
-                client_thread.start()
-            except Exception as e:
-                logger.error(f"Error accepting connection: {str(e)}")
+        selector = selectors.DefaultSelector()
+        selector.register(self.server_socket, selectors.EVENT_READ)
+        self.selector = selector
+        try:
+            while self.running:
+                for key, events in selector.select(SELECT_TIMEOUT):
+                    connection = key.data
+                    if connection is None:
+                        self._accept_client()
+                        continue
+                    if events & selectors.EVENT_WRITE:
+                        self._flush_client(connection)
+                    if events & selectors.EVENT_READ and connection.client_id in self.clients:
+                        self._handle_client(connection)
+        finally:
+            selector.close()
+
+    def _accept_client(self):
+        """Accept a pending connection and start watching it for data"""
+        try:
+            client_socket, address = self.server_socket.accept()
+        except Exception as e:
+            logger.error("Error accepting connection: %s", e)
+            return
+        client_socket.setblocking(False)
+        client_id = f"{address[0]}:{address[1]}"
+        connection = ClientConnection(client_id, client_socket)
+        with self.lock:
+            self.clients[client_id] = connection
+            self.selector.register(client_socket, selectors.EVENT_READ, connection)
 
     def stop(self):
         """Stop the TCP server"""
         self.running = False
-        for client in self.clients.values():
+        for connection in self.clients.values():
             try:
-                client.close()
+                connection.socket.close()
             except:
                 pass
         self.server_socket.close()
 
-    def _handle_client(self, client_socket: socket.socket, address: Tuple[str, int]):
-        """Handle a client connection"""
-        client_id = f"{address[0]}:{address[1]}"
-        self.clients[client_id] = client_socket
-        
+    def _handle_client(self, connection: ClientConnection):
+        """Read what a readable client has sent and handle every complete message"""
+        client_id = connection.client_id
+        buffer = connection.buffer
+        handlers = self.message_handlers
         try:
-            while self.running:
-                # Read message length (4 bytes)
-                length_data = client_socket.recv(4)
-                if not length_data:
+            try:
+                chunk = connection.socket.recv(RECV_BUFFER_SIZE)
+            except BlockingIOError:
+                return
+            if not chunk:
+                self._close_client(connection)
+                return
+            buffer += chunk
+
+            offset = 0
+            header_size = HEADER.size
+            while len(buffer) - offset >= header_size:
+                length = HEADER.unpack_from(buffer, offset)[0]
+                if length > MAX_FRAME:
+                    raise NetworkError(f"Frame too large: {length} bytes")
+                end = offset + header_size + length
+                if len(buffer) < end:
                     break
-                    
-                length = struct.unpack('!I', length_data)[0]
-                
-                # Read message data
-                data = b''
-                while len(data) < length:
-                    chunk = client_socket.recv(min(length - len(data), 4096))
-                    if not chunk:
-                        break
-                    data += chunk
-                
-                if len(data) == length:
-                    message = MessageProtocol.unpack_message(data)
-                    if message.type in self.message_handlers:
-                        self.message_handlers[message.type](client_id, message.data)
-                    else:
-                        logger.warning(f"Unknown message type: {message.type}")
-                        
+                message = MessageProtocol.unpack_message(buffer[offset + header_size:end])
+                offset = end
+
+                handler = handlers.get(message.type)
+                if handler is not None:
+                    handler(client_id, message.data)
+                else:
+                    logger.warning("Unknown message type: %s", message.type)
+            del buffer[:offset]
+
         except Exception as e:
-            logger.error(f"Error handling client {client_id}: {str(e)}")
-        finally:
-            del self.clients[client_id]
-            client_socket.close()
+            logger.error("Error handling client %s: %s", client_id, e)
+            self._close_client(connection)
+
+    def _close_client(self, connection: ClientConnection):
+        """Stop watching a client and close its socket"""
+        with self.lock:
+            self.clients.pop(connection.client_id, None)
+            try:
+                self.selector.unregister(connection.socket)
+            except (KeyError, ValueError):
+                pass
+            connection.socket.close()
+
+    def _queue(self, connection: ClientConnection, data: bytes):
+        """Send what the socket takes right away and buffer the rest for the selector"""
+        with self.lock:
+            if self.clients.get(connection.client_id) is not connection:
+                return
+            outgoing = connection.outgoing
+            if not outgoing:
+                try:
+                    sent = connection.socket.send(data)
+                except BlockingIOError:
+                    sent = 0
+                if sent == len(data):
+                    return
+                data = data[sent:]
+                self.selector.modify(connection.socket, selectors.EVENT_READ | selectors.EVENT_WRITE, connection)
+            if len(outgoing) + len(data) > MAX_PENDING_OUTPUT:
+                self._close_client(connection)
+                raise NetworkError(f"Client {connection.client_id} left more than {MAX_PENDING_OUTPUT} bytes unread")
+            outgoing += data
+
+    def _flush_client(self, connection: ClientConnection):
+        """Write as much buffered output as a writable client takes"""
+        with self.lock:
+            if self.clients.get(connection.client_id) is not connection or not connection.outgoing:
+                return
+            try:
+                sent = connection.socket.send(connection.outgoing)
+            except BlockingIOError:
+                return
+            except OSError as e:
+                logger.error("Error sending message to %s: %s", connection.client_id, e)
+                self._close_client(connection)
+                return
+            del connection.outgoing[:sent]
+            if not connection.outgoing:
+                self.selector.modify(connection.socket, selectors.EVENT_READ, connection)
 
     def send_message(self, client_id: str, message: Message):
         """Send a message to a specific client"""
-        if client_id in self.clients:
+        connection = self.clients.get(client_id)
+        if connection is not None:
             try:
-                data = MessageProtocol.pack_message(message)
-                self.clients[client_id].sendall(data)
+                self._queue(connection, MessageProtocol.pack_message(message))
             except Exception as e:
-                logger.error(f"Error sending message to {client_id}: {str(e)}")
+                logger.error("Error sending message to %s: %s", client_id, e)
                 raise NetworkError(f"Failed to send message: {str(e)}")
 
+    def broadcast(self, client_ids, message: Message):
+        """Send one message to several clients, encoding it only once; a failed
+        client does not stop delivery to the rest"""
+        data = MessageProtocol.pack_message(message)
+        clients = self.clients
+        failed = []
+        for client_id in client_ids:
+            connection = clients.get(client_id)
+            if connection is None:
+                continue
+            try:
+                self._queue(connection, data)
+            except Exception as e:
+                logger.error("Error sending message to %s: %s", client_id, e)
+                failed.append(client_id)
+        if failed:
+            raise NetworkError(f"Failed to send message to: {', '.join(failed)}")
+
 class TCPClient:
-    def __init__(self, host: str = 'localhost', port: int = 8765):
+    def __init__(self, host: str = 'localhost', port: int = 8765,
+                 dispatch: Optional[Callable[[callable, Dict[str, Any]], Any]] = None):
+        """`dispatch(handler, data)` hands decoded messages to another thread,
+        e.g. `functools.partial(root.after, 0)` for Tk; by default handlers run
+        on the receive thread"""
         self.host = host
         self.port = port
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.message_queue = queue.Queue()
         self.running = False
         self.message_handlers: Dict[str, callable] = {}
+        self.dispatch = dispatch
 
     def connect(self):
         """Connect to the server"""
@@ -141,7 +307,7 @@ class TCPClient:
             self.running = True
             self.receive_thread = threading.Thread(target=self._receive_messages)
             self.receive_thread.start()
-            logger.info(f"Connected to server at {self.host}:{self.port}")
+            logger.info("Connected to server at %s:%s", self.host, self.port)
         except Exception as e:
             raise NetworkError(f"Failed to connect: {str(e)}")
 
@@ -163,33 +329,27 @@ class TCPClient:
 
     def _receive_messages(self):
         """Receive messages from the server"""
+        read_message = MessageProtocol.read_message
+        handlers = self.message_handlers
+        dispatch = self.dispatch
         while self.running:
             try:
-                # Read message length (4 bytes)
-                length_data = self.socket.recv(4)
-                if not length_data:
+                message = read_message(self.socket)
+                if message is None:
                     break
-                    
-                length = struct.unpack('!I', length_data)[0]
-                
-                # Read message data
-                data = b''
-                while len(data) < length:
-                    chunk = self.socket.recv(min(length - len(data), 4096))
-                    if not chunk:
-                        break
-                    data += chunk
-                
-                if len(data) == length:
-                    message = MessageProtocol.unpack_message(data)
-                    if message.type in self.message_handlers:
-                        self.message_handlers[message.type](message.data)
+
+                handler = handlers.get(message.type)
+                if handler is not None:
+                    if dispatch is not None:
+                        dispatch(handler, message.data)
                     else:
-                        logger.warning(f"Unknown message type: {message.type}")
-                        
+                        handler(message.data)
+                else:
+                    logger.warning("Unknown message type: %s", message.type)
+
             except Exception as e:
                 if self.running:
-                    logger.error(f"Error receiving message: {str(e)}")
+                    logger.error("Error receiving message: %s", e)
                 break
         
         self.disconnect() 
\ No newline at end of file
@@ -1,11 +1,42 @@
 import socket
 import threading
 import pickle
-import uuid
+import struct
+import base64
+import secrets
+import logging
 from collections import defaultdict
+from contextlib import nullcontext
+
+from network import MAX_FRAME
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 PLAYER_X = 1
 PLAYER_O = 2
+# Win checks use bitboards: every row, column and diagonal is split into 64-cell
+# words, one dict of words per line family and player. A word's key packs the line
+# and the word index into one int, which is unique for 32-bit coordinates.
+WORD_SHIFT = 6
+WORD_MASK = (1 << WORD_SHIFT) - 1
+COORD_MIN = -2 ** 31
+COORD_MAX = 2 ** 31
+LISTEN_BACKLOG = 128
+RECV_BUFFER_SIZE = 65536
+HEADER = struct.Struct('!I')
+
+ERROR_ROOM_UNAVAILABLE = "Camera nu există sau este plină."
+ERROR_INVALID_COMMAND = "Comandă invalidă."
+ERROR_NOT_YOUR_TURN = "Nu este rândul tău!"
+ERROR_INVALID_MOVE = "Mutare invalidă!"
+ERROR_GAME_NOT_ACTIVE = "Jocul nu este activ."
+# Scatter writes let the length prefix and the pickle go out without being joined.
+HAS_SENDMSG = hasattr(socket.socket, "sendmsg")
+# Client threads only parse small messages and update dicts; the 8 MB default
+# stack is mostly reserved address space per connection.
+THREAD_STACK_SIZE = 512 * 1024
 
 
 class GameServer:
@@ -15,107 +46,198 @@ class GameServer:
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.server_socket.bind((self.host, self.port))
-        self.server_socket.listen(5)
-        print(f"Server started on {self.host}:{self.port}")
+        self.server_socket.listen(LISTEN_BACKLOG)
+        logger.info("Server started on %s:%s", self.host, self.port)
 
         self.rooms = {}
         self.player_names_to_room = {}
         self.players_in_room_order = defaultdict(list)
         self.players_ready = defaultdict(set)
 
+        # Error replies never change, so each is pickled and framed once up front.
+        self.error_frames = {
+            message: self.pack_message({"type": "error", "message": message})
+            for message in (ERROR_ROOM_UNAVAILABLE, ERROR_INVALID_COMMAND, ERROR_NOT_YOUR_TURN, ERROR_INVALID_MOVE,
+                            ERROR_GAME_NOT_ACTIVE)
+        }
+
     def start(self):
+        threading.stack_size(THREAD_STACK_SIZE)
         while True:
             conn, addr = self.server_socket.accept()
+            # Small move frames must not sit behind Nagle waiting on a delayed ACK.
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             threading.Thread(target=self.handle_client, args=(conn, addr), daemon=True).start()
 
     def handle_client(self, conn, addr):
         player_name = None
         room_id = None
         try:
-            player_name = conn.recv(1024).decode("utf-8").strip()
-            print(f"[SERVER] Player {player_name} connected from {addr}")
+            # The name and the CREATE/JOIN choice are framed like every other message,
+            # so they arrive intact even when TCP merges or splits them.
+            messages = self.iter_messages(conn)
+            name = next(messages, None)
+            if not isinstance(name, str):
+                conn.close()
+                return
+            player_name = name.strip()
+            logger.info("[SERVER] Player %s connected from %s", player_name, addr)
 
-            choice_data = conn.recv(1024).decode("utf-8").strip()
+            choice_data = next(messages, None)
+            choice_data = choice_data.strip() if isinstance(choice_data, str) else ""
 
             if choice_data == "CREATE":
-                room_id = str(uuid.uuid4())[:8].upper()
-                self.rooms[room_id] = {
+                room = {
+                    'lock': threading.Lock(),
                     'players': {},
                     'board': {},
+                    'lines': self.new_lines(),
+                    'next_turn': {},
                     'turn': None,
                     'game_started': False,
                     'player_symbols': {},
                     'game_over': False,
                     'winner': None
                 }
-                self.rooms[room_id]['players'][player_name] = conn
-                self.player_names_to_room[player_name] = room_id
-                self.players_in_room_order[room_id].append(player_name)
-                self.rooms[room_id]['player_symbols'][player_name] = PLAYER_X
-                print(f"[SERVER] Player {player_name} created room {room_id} and is {PLAYER_X}")
-                self.send_message(conn, {"type": "room_created", "room_id": room_id, "player": PLAYER_X})
+                with room['lock']:
+                    room_id = self.add_room(room)
+                    room['players'][player_name] = conn
+                    self.player_names_to_room[player_name] = room_id
+                    self.players_in_room_order[room_id].append(player_name)
+                    self.link_turn_order(room_id)
+                    room['player_symbols'][player_name] = PLAYER_X
+                    logger.info("[SERVER] Player %s created room %s and is %s", player_name, room_id, PLAYER_X)
+                    self.send_message(conn, {"type": "room_created", "room_id": room_id, "player": PLAYER_X})
+                    self.broadcast_room_info(room_id)
 
             elif choice_data.startswith("JOIN"):
                 room_id = choice_data.split(" ")[1]
-                if room_id not in self.rooms or len(self.rooms[room_id]['players']) >= 2:
-                    self.send_message(conn, {"type": "error", "message": "Camera nu există sau este plină."})
+                room = self.rooms.get(room_id)
+                if room is None:
+                    self.send_frame(conn, self.error_frames[ERROR_ROOM_UNAVAILABLE])
                     conn.close()
                     return
 
-                self.rooms[room_id]['players'][player_name] = conn
-                self.player_names_to_room[player_name] = room_id
-                self.players_in_room_order[room_id].append(player_name)
-                self.rooms[room_id]['player_symbols'][player_name] = PLAYER_O
-                print(f"[SERVER] Player {player_name} joined room {room_id} and is {PLAYER_O}")
-                self.send_message(conn, {"type": "room_joined", "room_id": room_id, "player": PLAYER_O})
+                with room['lock']:
+                    # The room may have emptied and been deleted while this thread waited.
+                    if self.rooms.get(room_id) is not room or len(room['players']) >= 2:
+                        self.send_frame(conn, self.error_frames[ERROR_ROOM_UNAVAILABLE])
+                        conn.close()
+                        return
+
+                    room['players'][player_name] = conn
+                    self.player_names_to_room[player_name] = room_id
+                    self.players_in_room_order[room_id].append(player_name)
+                    self.link_turn_order(room_id)
+                    room['player_symbols'][player_name] = PLAYER_O
+                    logger.info("[SERVER] Player %s joined room %s and is %s", player_name, room_id, PLAYER_O)
+                    self.send_message(conn, {"type": "room_joined", "room_id": room_id, "player": PLAYER_O})
+                    self.broadcast_room_info(room_id)
 
             else:
-                self.send_message(conn, {"type": "error", "message": "Comandă invalidă."})
+                self.send_frame(conn, self.error_frames[ERROR_INVALID_COMMAND])
                 conn.close()
                 return
 
-            self.broadcast_room_info(room_id)
-
-            while True:
-                data = conn.recv(4096)
-                if not data:
-                    break
-                msg = pickle.loads(data)
+            for msg in messages:
                 self.handle_message(player_name, room_id, msg)
 
         except Exception as e:
-            print(f"[SERVER] Error handling client {player_name}: {e}")
+            logger.error("[SERVER] Error handling client %s: %s", player_name, e)
         finally:
             if player_name:
-                print(f"[SERVER] Player {player_name} disconnected.")
+                logger.info("[SERVER] Player %s disconnected.", player_name)
                 self.remove_player_from_room(player_name, room_id, conn)
             else:
                 conn.close()
 
+    def add_room(self, room):
+        # Room ids are 40 random bits shown as 8 base32 characters, so they cannot be
+        # guessed from one another; setdefault claims an id atomically, and a taken
+        # one is simply drawn again.
+        while True:
+            room_id = base64.b32encode(secrets.token_bytes(5)).decode('ascii')
+            if self.rooms.setdefault(room_id, room) is room:
+                return room_id
+
+    def link_turn_order(self, room_id):
+        # Maps each player to whoever moves after them, so a move advances the turn
+        # with one lookup; rebuilt whenever someone joins or leaves.
+        order = self.players_in_room_order[room_id]
+        self.rooms[room_id]['next_turn'] = {
+            name: order[(index + 1) % len(order)] for index, name in enumerate(order)
+        }
+
     def init_board(self):
         return [[0 for _ in range(3)] for _ in range(3)]
 
-    def send_message(self, conn, msg):
+    def iter_messages(self, conn):
+        # Game messages are length-prefixed pickles. Each recv takes whatever has
+        # arrived and every complete frame in it is handed out before reading again,
+        # so a burst of moves costs one syscall instead of two per message.
+        # Reads land in one scratch buffer per connection and frames are unpickled
+        # straight out of the pending bytes, so neither step allocates a copy.
+        buffer = bytearray()
+        scratch = bytearray(RECV_BUFFER_SIZE)
+        scratch_view = memoryview(scratch)
+        header_size = HEADER.size
+        while True:
+            offset = 0
+            with memoryview(buffer) as view:
+                while len(buffer) - offset >= header_size:
+                    length = HEADER.unpack_from(buffer, offset)[0]
+                    if length > MAX_FRAME:
+                        raise ValueError(f"Frame too large: {length} bytes")
+                    end = offset + header_size + length
+                    if len(buffer) < end:
+                        break
+                    yield pickle.loads(view[offset + header_size:end])
+                    offset = end
+            del buffer[:offset]
+
+            count = conn.recv_into(scratch)
+            if not count:
+                return
+            buffer += scratch_view[:count]
+
+    def pack_message(self, msg):
+        data = pickle.dumps(msg, protocol=pickle.HIGHEST_PROTOCOL)
+        return HEADER.pack(len(data)), data
+
+    def send_frame(self, conn, frame):
+        header, data = frame
         try:
-            conn.sendall(pickle.dumps(msg))
+            if HAS_SENDMSG:
+                sent = conn.sendmsg(frame)
+                if sent < len(header) + len(data):
+                    conn.sendall((header + data)[sent:])
+            else:
+                conn.sendall(header + data)
         except Exception as e:
-            print(f"[SERVER] Error sending message: {e}")
+            logger.error("[SERVER] Error sending message: %s", e)
+
+    def send_message(self, conn, msg):
+        self.send_frame(conn, self.pack_message(msg))
 
     def broadcast_to_room(self, room_id, msg):
         if room_id not in self.rooms:
             return
-        for name, client_conn in self.rooms[room_id]['players'].items():
-            self.send_message(client_conn, msg)
+        # Every player gets the same bytes, so the message is pickled only once.
+        frame = self.pack_message(msg)
+        for client_conn in self.rooms[room_id]['players'].values():
+            self.send_frame(client_conn, frame)
 
     def broadcast_room_info(self, room_id):
-        if room_id not in self.rooms:
+        room = self.rooms.get(room_id)
+        if room is None:
             return
 
-        players_info_list = []
-        for name in self.players_in_room_order[room_id]:
-            symbol = self.rooms[room_id]['player_symbols'].get(name, '?')
-            is_ready = name in self.players_ready[room_id]
-            players_info_list.append({"name": name, "symbol": symbol, "is_ready": is_ready})
+        symbols = room['player_symbols']
+        ready = self.players_ready[room_id]
+        players_info_list = [
+            {"name": name, "symbol": symbols.get(name, '?'), "is_ready": name in ready}
+            for name in self.players_in_room_order[room_id]
+        ]
 
         self.broadcast_to_room(room_id, {
             "type": "room_info",
@@ -125,31 +247,34 @@ class GameServer:
     def handle_message(self, player_name, room_id, msg):
         room = self.rooms.get(room_id)
         if not room:
-            print(f"[SERVER] Room {room_id} not found for player {player_name}")
+            logger.warning("[SERVER] Room %s not found for player %s", room_id, player_name)
             return
 
-        if msg["type"] == "chat":
-            print(f"[SERVER] Chat from {msg.get('player_name', 'Unknown')} in {room_id}: {msg['message']}")
-            self.broadcast_to_room(room_id, {
-                "type": "chat",
-                "player": msg.get("player_name", "Unknown"),
-                "message": msg["message"]
-            })
+        # Everything a message changes, and the frames it sends, happen under the
+        # room's lock, so two players' threads never interleave in one room.
+        with room['lock']:
+            if msg["type"] == "chat":
+                logger.debug("[SERVER] Chat from %s in %s: %s", msg.get('player_name', 'Unknown'), room_id, msg['message'])
+                self.broadcast_to_room(room_id, {
+                    "type": "chat",
+                    "player": msg.get("player_name", "Unknown"),
+                    "message": msg["message"]
+                })
 
-        elif msg["type"] == "ready":
-            self.players_ready[room_id].add(player_name)
-            print(f"[SERVER] Player {player_name} is ready in room {room_id}")
-            self.broadcast_room_info(room_id)
+            elif msg["type"] == "ready":
+                self.players_ready[room_id].add(player_name)
+                logger.info("[SERVER] Player %s is ready in room %s", player_name, room_id)
+                self.broadcast_room_info(room_id)
 
-            if len(self.players_ready[room_id]) == 2 and len(room['players']) == 2:
-                self.start_game(room_id)
+                if len(self.players_ready[room_id]) == 2 and len(room['players']) == 2:
+                    self.start_game(room_id)
 
-        elif msg["type"] == "move":
-            self.handle_move(player_name, room_id, msg)
+            elif msg["type"] == "move":
+                self.handle_move(player_name, room_id, msg)
 
-        elif msg["type"] == "restart_game":
-            if room['game_over']:
-                self.restart_game(room_id)
+            elif msg["type"] == "restart_game":
+                if room['game_over']:
+                    self.restart_game(room_id)
 
     def start_game(self, room_id):
         room = self.rooms[room_id]
@@ -157,104 +282,119 @@ class GameServer:
         room['game_over'] = False
         room['winner'] = None
         room['board'] = {}
+        room['lines'] = self.new_lines()
 
         first_player = self.players_in_room_order[room_id][0]
         room['turn'] = first_player
 
-        print(f"[SERVER] Game started in room {room_id}. Turn: {first_player}")
+        logger.info("[SERVER] Game started in room %s. Turn: %s", room_id, first_player)
 
-        for player_name in room['players']:
-            is_my_turn = (player_name == first_player)
-            self.send_message(room['players'][player_name], {
+        board = room['board']
+        symbols = room['player_symbols']
+        for player_name, client_conn in room['players'].items():
+            self.send_message(client_conn, {
                 "type": "init",
-                "board": room['board'],
-                "is_my_turn": is_my_turn,
-                "player_symbol": room['player_symbols'][player_name],
+                "board": board,
+                "is_my_turn": player_name == first_player,
+                "player_symbol": symbols[player_name],
                 "current_turn_player_name": first_player
             })
 
     def handle_move(self, player_name, room_id, msg):
         room = self.rooms[room_id]
 
+        # Every dropped move gets an error back, so the client can take back its prediction.
         if not room['game_started'] or room['game_over']:
+            self.send_frame(room['players'][player_name], self.error_frames[ERROR_GAME_NOT_ACTIVE])
             return
 
         if room['turn'] != player_name:
-            self.send_message(room['players'][player_name], {
-                "type": "error",
-                "message": "Nu este rândul tău!"
-            })
+            self.send_frame(room['players'][player_name], self.error_frames[ERROR_NOT_YOUR_TURN])
             return
 
-        x, y = msg['x'], msg['y']
+        x, y = msg.get('x'), msg.get('y')
+        cell = (x, y)
+        board = room['board']
 
-        if (x, y) in room['board']:
-            self.send_message(room['players'][player_name], {
-                "type": "error",
-                "message": "Mutare invalidă!"
-            })
+        # The bitboard keys are only unique for 32-bit coordinates, so anything else
+        # is refused before the room is touched.
+        if (type(x) is not int or type(y) is not int
+                or not COORD_MIN <= x < COORD_MAX or not COORD_MIN <= y < COORD_MAX
+                or cell in board):
+            self.send_frame(room['players'][player_name], self.error_frames[ERROR_INVALID_MOVE])
             return
 
         player_symbol = room['player_symbols'][player_name]
-        room['board'][(x, y)] = player_symbol
+        board[cell] = player_symbol
+        lines = room['lines'][player_symbol]
+        self.place_on_lines(lines, x, y)
 
-        print(f"[SERVER] Player {player_name} moved to ({x}, {y}) in room {room_id}")
+        logger.debug("[SERVER] Player %s moved to (%s, %s) in room %s", player_name, x, y, room_id)
 
-        winner = self.check_winner_infinite(room['board'], x, y, player_symbol)
+        winner = self.check_winner_infinite(lines, x, y, player_symbol)
 
         if winner:
             room['game_over'] = True
             room['winner'] = winner
 
-            winner_name = None
-            for name, symbol in room['player_symbols'].items():
-                if symbol == winner:
-                    winner_name = name
-                    break
-
-            for other_player_name in room['players']:
-                self.send_message(room['players'][other_player_name], {
-                    "type": "win",
-                    "x": x,
-                    "y": y,
-                    "player_symbol": player_symbol,
-                    "winner": winner_name
-                })
-            print(f"[SERVER] Game over in room {room_id}. Winner: {winner_name}")
+            # Only the player who just moved can have completed a line.
+            winner_name = player_name
+
+            self.broadcast_to_room(room_id, {
+                "type": "win",
+                "x": x,
+                "y": y,
+                "player_symbol": player_symbol,
+                "winner": winner_name
+            })
+            logger.info("[SERVER] Game over in room %s. Winner: %s", room_id, winner_name)
         else:
-            current_index = self.players_in_room_order[room_id].index(player_name)
-            next_index = (current_index + 1) % len(self.players_in_room_order[room_id])
-            next_player = self.players_in_room_order[room_id][next_index]
+            next_player = room['next_turn'][player_name]
             room['turn'] = next_player
 
-            for other_player_name in room['players']:
-                is_my_turn = (other_player_name == next_player)
-                self.send_message(room['players'][other_player_name], {
-                    "type": "update",
-                    "x": x,
-                    "y": y,
-                    "player_symbol": player_symbol,
-                    "is_my_turn": is_my_turn,
-                    "turn": next_player
-                })
-
-    def check_winner_infinite(self, board, x, y, player_symbol):
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
-
-        for dx, dy in directions:
-            count = 1
-
-            i, j = x + dx, y + dy
-            while (i, j) in board and board[(i, j)] == player_symbol:
-                count += 1
-                i, j = i + dx, j + dy
-
-            i, j = x - dx, y - dy
-            while (i, j) in board and board[(i, j)] == player_symbol:
-                count += 1
-                i, j = i - dx, j - dy
-
-            if count >= 5:
+            # The update only differs in is_my_turn, so it is built once and packed
+            # once per value rather than once per player.
+            update = {
+                "type": "update",
+                "x": x,
+                "y": y,
+                "player_symbol": player_symbol,
+                "is_my_turn": False,
+                "turn": next_player
+            }
+            waiting_frame = self.pack_message(update)
+            update["is_my_turn"] = True
+            turn_frame = self.pack_message(update)
+
+            for other_player_name, client_conn in room['players'].items():
+                self.send_frame(client_conn, turn_frame if other_player_name == next_player else waiting_frame)
+
+    def new_lines(self):
+        # Rows, columns, diagonals and anti-diagonals for each player symbol.
+        return {PLAYER_X: ({}, {}, {}, {}), PLAYER_O: ({}, {}, {}, {})}
+
+    def line_positions(self, x, y):
+        # Which line of each family the cell is on, and its position along that line.
+        return zip((y, x, x - y, x + y), (x, y, x, x))
+
+    def place_on_lines(self, lines, x, y):
+        for words, (line, pos) in zip(lines, self.line_positions(x, y)):
+            key = (line << 32) + (pos >> WORD_SHIFT)
+            words[key] = words.get(key, 0) | (1 << (pos & WORD_MASK))
+
+    def check_winner_infinite(self, lines, x, y, player_symbol):
+        for words, (line, pos) in zip(lines, self.line_positions(x, y)):
+            # Bits 0-8 of the window are the cells from pos - 4 to pos + 4, taken
+            # from at most two adjacent words.
+            low = pos - 4
+            key = (line << 32) + (low >> WORD_SHIFT)
+            offset = low & WORD_MASK
+            window = words.get(key, 0) >> offset
+            if offset > WORD_MASK - 8:
+                window |= words.get(key + 1, 0) << (WORD_MASK + 1 - offset)
+
+            # A run of five through the new piece has to start at one of bits 0-4.
+            if window & (window >> 1) & (window >> 2) & (window >> 3) & (window >> 4) & 0x1F:
                 return player_symbol
 
         return None
@@ -292,7 +432,7 @@ class GameServer:
 
         self.players_ready[room_id].clear()
 
-        print(f"[SERVER] Game restarted in room {room_id}")
+        logger.info("[SERVER] Game restarted in room %s", room_id)
 
         self.broadcast_to_room(room_id, {
             "type": "game_restarted",
@@ -310,25 +450,34 @@ class GameServer:
         if not player_name or not room_id:
             return
 
-        if room_id in self.rooms and player_name in self.rooms[room_id]['players']:
-            del self.rooms[room_id]['players'][player_name]
+        room = self.rooms.get(room_id)
+        with room['lock'] if room else nullcontext():
+            self.leave_room(player_name, room_id)
+
+    def leave_room(self, player_name, room_id):
+        room = self.rooms.get(room_id)
+        if room is not None:
+            room['players'].pop(player_name, None)
 
-        if player_name in self.player_names_to_room:
-            del self.player_names_to_room[player_name]
+        self.player_names_to_room.pop(player_name, None)
 
-        if room_id in self.players_in_room_order and player_name in self.players_in_room_order[room_id]:
-            self.players_in_room_order[room_id].remove(player_name)
+        order = self.players_in_room_order.get(room_id)
+        if order and player_name in order:
+            order.remove(player_name)
+            if room is not None:
+                self.link_turn_order(room_id)
 
-        if room_id in self.players_ready and player_name in self.players_ready[room_id]:
-            self.players_ready[room_id].discard(player_name)
+        ready = self.players_ready.get(room_id)
+        if ready:
+            ready.discard(player_name)
 
-        if room_id in self.rooms and len(self.rooms[room_id]['players']) == 0:
+        if room is not None and not room['players']:
             del self.rooms[room_id]
             if room_id in self.players_in_room_order:
                 del self.players_in_room_order[room_id]
             if room_id in self.players_ready:
                 del self.players_ready[room_id]
-            print(f"[SERVER] Room {room_id} deleted (empty)")
+            logger.info("[SERVER] Room %s deleted (empty)", room_id)
         else:
             self.broadcast_to_room(room_id, {
                 "type": "player_disconnected",
@@ -336,8 +485,8 @@ class GameServer:
             })
             self.broadcast_room_info(room_id)
 
-            if room_id in self.rooms and self.rooms[room_id]['game_started'] and not self.rooms[room_id]['game_over']:
-                self.rooms[room_id]['game_over'] = True
+            if room is not None and room['game_started'] and not room['game_over']:
+                room['game_over'] = True
                 self.broadcast_to_room(room_id, {
                     "type": "game_interrupted",
                     "message": f"Jocul s-a întrerupt - {player_name} s-a deconectat"
@@ -347,8 +496,8 @@ class GameServer:
 if __name__ == "__main__":
     server = GameServer()
     try:
-        print("Starting Tic-Tac-Toe server...")
+        logger.info("Starting Tic-Tac-Toe server...")
         server.start()
     except KeyboardInterrupt:
-        print("\n[SERVER] Shutting down...")
+        logger.info("[SERVER] Shutting down...")
         server.server_socket.close()
\ No newline at end of file